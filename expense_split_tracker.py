@@ -1,166 +1,369 @@
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+import heapq
+import os
+import sys
 import uuid
 
-@dataclass
+# __slots__ keeps records small and attribute access fast; dataclass(slots=True) needs Python 3.10+.
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class User:
     id: str
     name: str
     currency: str = "USD"
-    balance: float = 0.0
+    balance: int = 0
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Expense:
     id: str
     description: str
-    amount: float
+    amount: int
     currency: str
     split_type: str
-    shares: Dict[str, float]
+    shares: Dict[str, int]
     paid_by: Optional[str] = None
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Transaction:
     id: str
     from_user: Optional[str]
     to_user: Optional[str]
-    amount: float
+    amount: int
     currency: str
     note: str = ""
 
+# Random bytes for ids are read from the OS in bulk instead of one urandom call per uuid4().
+_ID_POOL_SIZE = 4096
+_id_pool = b""
+_id_offset = 0
+
+def _new_id() -> str:
+    global _id_pool, _id_offset
+    if _id_offset + 16 > len(_id_pool):
+        _id_pool = os.urandom(_ID_POOL_SIZE)
+        _id_offset = 0
+    raw = _id_pool[_id_offset:_id_offset + 16]
+    _id_offset += 16
+    return str(uuid.UUID(bytes=raw, version=4))
+
+def _reset_id_pool():
+    global _id_pool, _id_offset
+    _id_pool = b""
+    _id_offset = 0
+
+# A forked child must not hand out the same ids as its parent.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_pool)
+
+# The exact debt simplification is exponential in the number of users with open balances.
+EXACT_SIMPLIFY_MAX_USERS = 15
+
+# Monetary values are stored as integer cents; floats only appear at the API boundary.
+# Expense amounts are also kept in int64 columns, which caps a single amount.
+_MAX_CENTS = 2 ** 63 - 1
+
+def _to_cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+def _to_dollars(cents: int) -> float:
+    return cents / 100
+
+def _greedy_transfers(balances: List[int]) -> List[Tuple[int, int, int]]:
+    # Pure integer kernel over a list of balances: returns (debtor index, creditor index, cents)
+    # triples without touching any state. Heap entries are (amount, index) pairs of plain ints.
+    # Max-heaps (negated amounts) so the largest debtor always pays the largest creditor.
+    debtors = [(-bal, i) for i, bal in enumerate(balances) if bal > 0]
+    creditors = [(bal, i) for i, bal in enumerate(balances) if bal < 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+    transfers: List[Tuple[int, int, int]] = []
+    while debtors and creditors:
+        owe_amt, debtor = heapq.heappop(debtors)
+        recv_amt, creditor = heapq.heappop(creditors)
+        transfer = min(-owe_amt, -recv_amt)
+        transfers.append((debtor, creditor, transfer))
+        if -owe_amt > transfer:
+            heapq.heappush(debtors, (owe_amt + transfer, debtor))
+        if -recv_amt > transfer:
+            heapq.heappush(creditors, (recv_amt + transfer, creditor))
+    return transfers
+
+# -------------------- Split strategies --------------------
+# Each strategy maps an amount in cents to per-user shares in cents that add up to it exactly.
+
+def _split_equal(amount_c: int, users: Optional[List[str]], exact_amounts: Optional[Dict[str, float]],
+                 percentages: Optional[Dict[str, float]]) -> Dict[str, int]:
+    if not users:
+        raise ValueError("Equal split requires a list of users.")
+    # The leftover cents go one each to the first users so the shares always add up.
+    share, rem = divmod(amount_c, len(users))
+    shares = dict.fromkeys(users, share)
+    if len(shares) != len(users):
+        # A user listed more than once takes one share per listing.
+        shares = dict.fromkeys(users, 0)
+        for uid in users:
+            shares[uid] += share
+    for uid in users[:rem]:
+        shares[uid] += 1
+    return shares
+
+def _split_exact(amount_c: int, users: Optional[List[str]], exact_amounts: Optional[Dict[str, float]],
+                 percentages: Optional[Dict[str, float]]) -> Dict[str, int]:
+    if not exact_amounts:
+        raise ValueError("Exact split requires exact_amounts mapping.")
+    shares: Dict[str, int] = {}
+    total = 0
+    for uid, val in exact_amounts.items():
+        share = _to_cents(val)
+        shares[uid] = share
+        total += share
+    if total != amount_c:
+        raise ValueError(f"Exact amounts sum to {_to_dollars(total)}, which does not equal expense amount {_to_dollars(amount_c)}.")
+    return shares
+
+def _split_percentage(amount_c: int, users: Optional[List[str]], exact_amounts: Optional[Dict[str, float]],
+                      percentages: Optional[Dict[str, float]]) -> Dict[str, int]:
+    if not percentages:
+        raise ValueError("Percentage split requires percentages mapping.")
+    # Each share is the gap between consecutive rounded cumulative cuts, so the cents always add
+    # up and no share is off by more than a cent. The total is checked after the same pass.
+    shares: Dict[str, int] = {}
+    cum_pct = 0.0
+    prev_cut = 0
+    for uid, pct in percentages.items():
+        cum_pct += pct
+        cut = round(amount_c * cum_pct / 100)
+        shares[uid] = cut - prev_cut
+        prev_cut = cut
+    total_percent = round(cum_pct, 2)
+    if total_percent != 100:
+        raise ValueError(f"Percentages must sum to 100, got {total_percent}.")
+    # Whatever float drift is left in the last cut goes to the last user.
+    shares[next(reversed(percentages))] += amount_c - prev_cut
+    return shares
+
+_SPLIT_DISPATCH = {
+    "equal": _split_equal,
+    "exact": _split_exact,
+    "percentage": _split_percentage,
+}
+
 class Group:
     def __init__(self, name: str, currency: str = "USD"):
-        self.id = str(uuid.uuid4())
+        self.id = _new_id()
         self.name = name
         self.currency = currency
         self.users: Dict[str, User] = {}
         self.expenses: List[Expense] = []
         self.transactions: List[Transaction] = []
+        self._user_index: Dict[str, int] = {}
+        self._user_ids: List[str] = []
+        # Column-wise copy of the expense amounts and payers for analytics scans; payers are
+        # referred to by user index, -1 meaning nobody paid.
+        self._expense_amounts = array("q")
+        self._expense_paid_by = array("q")
     
     def add_user(self, name: str, currency: Optional[str] = None) -> User:
         currency = currency or self.currency
-        user = User(id=str(uuid.uuid4()), name=name, currency=currency, balance=0.0)
+        user = User(id=_new_id(), name=name, currency=currency, balance=0)
         self.users[user.id] = user
+        self._user_index[user.id] = len(self._user_ids)
+        self._user_ids.append(user.id)
         return user
     
     def _validate_currency(self, currency: str):
         if currency != self.currency:
             raise ValueError(f"Currency mismatch: group currency is {self.currency}, expense is {currency}.")
     
-    def add_expense(self, amount: float, split_type: str, users: Optional[List[str]] = None,
-                    exact_amounts: Optional[Dict[str, float]] = None,
-                    percentages: Optional[Dict[str, float]] = None,
-                    description: str = "", paid_by: Optional[str] = None,
-                    currency: Optional[str] = None) -> Expense:
+    def _prepare_expense(self, amount: float, split_type: str, users: Optional[List[str]] = None,
+                         exact_amounts: Optional[Dict[str, float]] = None,
+                         percentages: Optional[Dict[str, float]] = None,
+                         description: str = "", paid_by: Optional[str] = None,
+                         currency: Optional[str] = None) -> Tuple[Expense, Transaction]:
+        # Validates the input and computes the shares without touching the group's state.
         currency = currency or self.currency
         self._validate_currency(currency)
         split_type = split_type.lower()
-        shares: Dict[str, float] = {}
-        
-        if split_type == "equal":
-            if not users:
-                raise ValueError("Equal split requires a list of users.")
-            share = round(amount / len(users), 2)
-            for i, uid in enumerate(users):
-                shares[uid] = share
-            total_assigned = sum(shares.values())
-            if total_assigned != round(amount, 2):
-                diff = round(amount - total_assigned, 2)
-                shares[users[-1]] += diff
-        
-        elif split_type == "exact":
-            if not exact_amounts:
-                raise ValueError("Exact split requires exact_amounts mapping.")
-            total = round(sum(exact_amounts.values()), 2)
-            if abs(total - amount) > 1e-9:
-                raise ValueError(f"Exact amounts sum to {total}, which does not equal expense amount {amount}.")
-            shares = {uid: round(val, 2) for uid, val in exact_amounts.items()}
+        amount_c = _to_cents(amount)
+        if abs(amount_c) > _MAX_CENTS:
+            raise ValueError(f"Amount {amount} is too large; the limit is {_to_dollars(_MAX_CENTS)}.")
+        try:
+            split = _SPLIT_DISPATCH[split_type]
+        except KeyError:
+            raise ValueError("Unsupported split_type. Use 'equal', 'exact', or 'percentage'.") from None
+        shares = split(amount_c, users, exact_amounts, percentages)
         
-        elif split_type == "percentage":
-            if not percentages:
-                raise ValueError("Percentage split requires percentages mapping.")
-            total_percent = round(sum(percentages.values()), 2)
-            if abs(total_percent - 100.0) > 1e-9:
-                raise ValueError(f"Percentages must sum to 100, got {total_percent}.")
-            for uid, pct in percentages.items():
-                shares[uid] = round(amount * (pct / 100.0), 2)
-            total_assigned = sum(shares.values())
-            if total_assigned != round(amount, 2):
-                diff = round(amount - total_assigned, 2)
-                last_uid = list(percentages.keys())[-1]
-                shares[last_uid] += diff
-        else:
-            raise ValueError("Unsupported split_type. Use 'equal', 'exact', or 'percentage'.")
-        
-        expense = Expense(id=str(uuid.uuid4()), description=description, amount=round(amount, 2),
+        expense = Expense(id=_new_id(), description=description, amount=amount_c,
                           currency=currency, split_type=split_type, shares=shares, paid_by=paid_by)
+        tx = Transaction(id=_new_id(), from_user=None, to_user=None, amount=amount_c, currency=currency, note=f"Expense: {description} ({split_type})")
+        return expense, tx
+    
+    def _check_members(self, expense: Expense):
+        # Runs before any state changes so an unknown user cannot leave a half-applied expense.
+        missing = expense.shares.keys() - self.users.keys()
+        if missing:
+            raise ValueError(f"User ids not in group: {', '.join(sorted(missing))}.")
+        if expense.paid_by and expense.paid_by not in self.users:
+            raise ValueError(f"Payer {expense.paid_by} not a member of the group.")
+    
+    def add_expense(self, amount: float, split_type: str, users: Optional[List[str]] = None,
+                    exact_amounts: Optional[Dict[str, float]] = None,
+                    percentages: Optional[Dict[str, float]] = None,
+                    description: str = "", paid_by: Optional[str] = None,
+                    currency: Optional[str] = None) -> Expense:
+        expense, tx = self._prepare_expense(amount, split_type, users=users, exact_amounts=exact_amounts,
+                                            percentages=percentages, description=description,
+                                            paid_by=paid_by, currency=currency)
+        self._check_members(expense)
+        self._record_expense_columns(expense)
         self.expenses.append(expense)
         
-        for uid, share_amt in shares.items():
-            if uid not in self.users:
-                raise ValueError(f"User id {uid} not in group.")
-            self.users[uid].balance = round(self.users[uid].balance + share_amt, 2)
-        
+        members = self.users
+        for uid, share_amt in expense.shares.items():
+            members[uid].balance += share_amt
         if paid_by:
-            if paid_by not in self.users:
-                raise ValueError(f"Payer {paid_by} not a member of the group.")
-            self.users[paid_by].balance = round(self.users[paid_by].balance - amount, 2)
+            members[paid_by].balance -= expense.amount
         
-        tx = Transaction(id=str(uuid.uuid4()), from_user=None, to_user=None, amount=round(amount,2), currency=currency, note=f"Expense: {description} ({split_type})")
         self.transactions.append(tx)
         
         return expense
     
+    def add_expenses_batch(self, records: List[dict]) -> List[Expense]:
+        # Each record takes the same keyword arguments as add_expense. Every record is validated
+        # and the balance changes are summed per user before anything is applied, so a bad record
+        # leaves the group untouched and each user's balance is written once.
+        members = self.users
+        deltas: Dict[str, int] = {}
+        expenses: List[Expense] = []
+        transactions: List[Transaction] = []
+        for record in records:
+            expense, tx = self._prepare_expense(**record)
+            self._check_members(expense)
+            for uid, share_amt in expense.shares.items():
+                deltas[uid] = deltas.get(uid, 0) + share_amt
+            if expense.paid_by:
+                deltas[expense.paid_by] = deltas.get(expense.paid_by, 0) - expense.amount
+            expenses.append(expense)
+            transactions.append(tx)
+        
+        for expense in expenses:
+            self._record_expense_columns(expense)
+        for uid, delta in deltas.items():
+            members[uid].balance += delta
+        self.expenses.extend(expenses)
+        self.transactions.extend(transactions)
+        return expenses
+    
+    def _record_expense_columns(self, expense: Expense):
+        self._expense_amounts.append(expense.amount)
+        self._expense_paid_by.append(self._user_index[expense.paid_by] if expense.paid_by else -1)
+    
+    def total_paid_by_user(self) -> Dict[str, float]:
+        totals = [0] * len(self._user_ids)
+        for payer, amount_c in zip(self._expense_paid_by, self._expense_amounts):
+            if payer >= 0:
+                totals[payer] += amount_c
+        return {uid: _to_dollars(total) for uid, total in zip(self._user_ids, totals)}
+    
     def settle_debt(self, user_id: str, amount: float, to_user_id: Optional[str] = None):
         if user_id not in self.users:
             raise ValueError("User not in group.")
         user = self.users[user_id]
-        amount = round(amount, 2)
-        if amount < 0:
+        amount_c = _to_cents(amount)
+        if amount_c < 0:
             raise ValueError("Amount must be non-negative.")
-        if user.balance > 0 and amount > user.balance + 1e-9:
-            raise ValueError(f"Cannot settle more than owed. User owes {user.balance}, tried to settle {amount}.")
-        if user.balance <= 0 and amount > 0:
-            raise ValueError(f"User does not owe anything (balance={user.balance}); cannot settle a positive amount.")
-        user.balance = round(user.balance - amount, 2)
-        tx = Transaction(id=str(uuid.uuid4()), from_user=user_id, to_user=to_user_id, amount=amount, currency=self.currency, note="Settlement")
+        if user.balance > 0 and amount_c > user.balance:
+            raise ValueError(f"Cannot settle more than owed. User owes {_to_dollars(user.balance)}, tried to settle {_to_dollars(amount_c)}.")
+        if user.balance <= 0 and amount_c > 0:
+            raise ValueError(f"User does not owe anything (balance={_to_dollars(user.balance)}); cannot settle a positive amount.")
+        user.balance -= amount_c
+        tx = Transaction(id=_new_id(), from_user=user_id, to_user=to_user_id, amount=amount_c, currency=self.currency, note="Settlement")
         self.transactions.append(tx)
         return tx
     
     def get_balances(self) -> Dict[str, float]:
-        return {uid: round(u.balance, 2) for uid, u in self.users.items()}
-    
-    def simplify_debts(self) -> List[Transaction]:
-        debtors: List[Tuple[str, float]] = []
-        creditors: List[Tuple[str, float]] = []
-        for uid, user in self.users.items():
-            bal = round(user.balance, 2)
-            if bal > 0:
-                debtors.append([uid, bal])
-            elif bal < 0:
-                creditors.append([uid, -bal])
-        debtors.sort(key=lambda x: x[1], reverse=True)
-        creditors.sort(key=lambda x: x[1], reverse=True)
+        return {uid: _to_dollars(u.balance) for uid, u in self.users.items()}
+    
+    def get_balances_cents(self) -> Dict[str, int]:
+        # Raw integer balances for callers that do their own math; skips the dollar conversion.
+        return {uid: u.balance for uid, u in self.users.items()}
+    
+    def _zero_sum_groups(self) -> List[List[str]]:
+        # Partition the open balances into as many zero-sum groups as possible. Each group of
+        # k users settles in k - 1 transfers, so this yields the minimum number of transfers.
+        # Subset DP over bitmasks: best[mask] is the max number of zero-sum groups in mask.
+        ids = [uid for uid, u in self.users.items() if u.balance != 0]
+        n = len(ids)
+        if n > EXACT_SIMPLIFY_MAX_USERS:
+            raise ValueError(f"Exact simplification supports at most {EXACT_SIMPLIFY_MAX_USERS} users with open balances, got {n}.")
+        bals = [self.users[uid].balance for uid in ids]
+        full = (1 << n) - 1
+        total = [0] * (full + 1)
+        best = [0] * (full + 1)
+        for mask in range(1, full + 1):
+            low = mask & -mask
+            total[mask] = total[mask ^ low] + bals[low.bit_length() - 1]
+            best[mask] = max(best[mask ^ (1 << j)] for j in range(n) if mask >> j & 1) + (total[mask] == 0)
+        # Walk back down from the full set; every zero-sum prefix closes a group.
+        groups: List[List[str]] = []
+        current: List[str] = []
+        mask = full
+        while mask:
+            if total[mask] == 0 and current:
+                groups.append(current)
+                current = []
+            target = best[mask] - (total[mask] == 0)
+            j = next(j for j in range(n) if mask >> j & 1 and best[mask ^ (1 << j)] == target)
+            current.append(ids[j])
+            mask ^= 1 << j
+        if current:
+            groups.append(current)
+        return groups
+    
+    def _settlement_groups(self, mode: str) -> List[List[str]]:
+        mode = mode.lower()
+        if mode == "greedy":
+            return [list(self.users)]
+        if mode == "exact":
+            return self._zero_sum_groups()
+        raise ValueError("Unsupported mode. Use 'greedy' or 'exact'.")
+    
+    def _planned_transfers(self, groups: List[List[str]]) -> Iterator[Tuple[str, str, int]]:
+        # Groups are disjoint, so each one can be planned from the balances as they stand when reached.
+        members = self.users
+        for user_ids in groups:
+            for debtor, creditor, transfer in _greedy_transfers([members[uid].balance for uid in user_ids]):
+                yield user_ids[debtor], user_ids[creditor], transfer
+    
+    def simplify_debts(self, mode: str = "greedy") -> List[Transaction]:
+        groups = self._settlement_groups(mode)
+        members = self.users
         settlements: List[Transaction] = []
-        i = 0
-        j = 0
-        while i < len(debtors) and j < len(creditors):
-            debtor_id, owe_amt = debtors[i]
-            creditor_id, recv_amt = creditors[j]
-            transfer = round(min(owe_amt, recv_amt), 2)
-            tx = Transaction(id=str(uuid.uuid4()), from_user=debtor_id, to_user=creditor_id, amount=transfer, currency=self.currency, note="Simplified settlement")
-            settlements.append(tx)
-            self.transactions.append(tx)
-            debtors[i][1] = round(debtors[i][1] - transfer, 2)
-            creditors[j][1] = round(creditors[j][1] - transfer, 2)
-            self.users[debtor_id].balance = round(self.users[debtor_id].balance - transfer, 2)
-            self.users[creditor_id].balance = round(self.users[creditor_id].balance + transfer, 2)
-            if abs(debtors[i][1]) < 1e-9:
-                i += 1
-            if abs(creditors[j][1]) < 1e-9:
-                j += 1
+        for debtor_id, creditor_id, transfer in self._planned_transfers(groups):
+            settlements.append(Transaction(_new_id(), debtor_id, creditor_id, transfer, self.currency, "Simplified settlement"))
+            members[debtor_id].balance -= transfer
+            members[creditor_id].balance += transfer
+        # The whole result is built anyway, so log it with one extend.
+        self.transactions.extend(settlements)
         return settlements
     
+    def iter_simplify_debts(self, mode: str = "greedy") -> Iterator[Transaction]:
+        # Lazy variant of simplify_debts: each settlement is applied to the balances and logged
+        # just before it is yielded, so a caller that stops early leaves the rest of the debts open.
+        return self._iter_settlements(self._settlement_groups(mode))
+    
+    def _iter_settlements(self, groups: List[List[str]]) -> Iterator[Transaction]:
+        members = self.users
+        for debtor_id, creditor_id, transfer in self._planned_transfers(groups):
+            tx = Transaction(_new_id(), debtor_id, creditor_id, transfer, self.currency, "Simplified settlement")
+            self.transactions.append(tx)
+            members[debtor_id].balance -= transfer
+            members[creditor_id].balance += transfer
+            yield tx
+    
     def view_transaction_history(self) -> List[Transaction]:
         return self.transactions
 
@@ -187,8 +390,11 @@ def settle_debt(group: Group, user: User, amount: float, to_user: Optional[User]
     to_id = to_user.id if to_user else None
     return group.settle_debt(user.id, amount, to_user_id=to_id)
 
-def simplify_debts(group: Group):
-    return group.simplify_debts()
+def simplify_debts(group: Group, mode: str = "greedy"):
+    return group.simplify_debts(mode=mode)
+
+def iter_simplify_debts(group: Group, mode: str = "greedy"):
+    return group.iter_simplify_debts(mode=mode)
 
 
 # -------------------- Tests --------------------
@@ -205,6 +411,28 @@ def run_tests():
     assert round(balances[user3.id],2) == 30.00
     print("test_equal_split passed. Balances:", {group.users[k].name: v for k,v in balances.items()})
     
+    print("Running test_get_balances_cents...")
+    group = create_group("Trip to Paris - cents")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    group.add_expense(amount=10.01, split_type="equal", users=[user1.id, user2.id], paid_by=user2.id)
+    balances = group.get_balances()
+    balances_cents = group.get_balances_cents()
+    assert balances_cents == {user1.id: 501, user2.id: -501}
+    assert all(isinstance(v, int) for v in balances_cents.values())
+    assert all(balances_cents[k] == round(v * 100) for k, v in balances.items())
+    print("test_get_balances_cents passed. Balances:", {group.users[k].name: v for k,v in balances_cents.items()})
+    
+    print("Running test_equal_split_duplicate_user...")
+    group = create_group("Trip to Paris - duplicates")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    group.add_expense(amount=90, split_type="equal", users=[user1.id, user1.id, user2.id], paid_by=user2.id)
+    balances = group.get_balances()
+    assert balances[user1.id] == 60.00
+    assert balances[user2.id] == -60.00
+    print("test_equal_split_duplicate_user passed. Balances:", {group.users[k].name: v for k,v in balances.items()})
+    
     print("Running test_exact_amount_split...")
     group = create_group("Dinner")
     user1 = add_user(group, "User1")
@@ -225,6 +453,25 @@ def run_tests():
     assert round(balances[user2.id],2) == 80.00
     print("test_percentage_split passed. Balances:", {group.users[k].name: v for k,v in balances.items()})
     
+    print("Running test_three_way_percentage_split...")
+    group = create_group("Three-way")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    user3 = add_user(group, "User3")
+    ids = [user1.id, user2.id, user3.id]
+    expense = group.add_expense(amount=100, split_type="percentage", percentages={uid: 100 / 3 for uid in ids})
+    assert sum(expense.shares.values()) == 10000
+    assert sorted(expense.shares.values()) == [3333, 3333, 3334]
+    expense = group.add_expense(amount=10, split_type="percentage", percentages=dict(zip(ids, [33.333, 33.333, 33.334])))
+    assert sum(expense.shares.values()) == 1000
+    assert all(333 <= v <= 334 for v in expense.shares.values())
+    try:
+        group.add_expense(amount=10, split_type="percentage", percentages=dict(zip(ids, [33, 33, 33])))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("test_three_way_percentage_split passed. Balances:", {group.users[k].name: v for k,v in group.get_balances().items()})
+    
     print("Running test_settling_debt...")
     group = create_group("Trip to Goa")
     user1 = add_user(group, "User1")
@@ -234,6 +481,40 @@ def run_tests():
     assert round(balances[user1.id],2) == 0.00
     print("test_settling_debt passed. Balances:", {group.users[k].name: v for k,v in balances.items()})
     
+    print("Running test_unknown_user_leaves_group_unchanged...")
+    group = create_group("Trip to Goa - validation")
+    user1 = add_user(group, "User1")
+    try:
+        group.add_expense(amount=40, split_type="equal", users=[user1.id, "missing"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert group.get_balances()[user1.id] == 0.00
+    assert not group.expenses and not group.transactions
+    print("test_unknown_user_leaves_group_unchanged passed.")
+    
+    print("Running test_oversized_amount_leaves_group_unchanged...")
+    group = create_group("Trip to Goa - oversized")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    try:
+        group.add_expense(amount=1e17, split_type="equal", users=[user1.id, user2.id], paid_by=user1.id)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    try:
+        group.add_expenses_batch([
+            {"amount": 10, "split_type": "equal", "users": [user1.id, user2.id], "paid_by": user1.id},
+            {"amount": 1e17, "split_type": "equal", "users": [user1.id, user2.id], "paid_by": user1.id},
+        ])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert all(v == 0 for v in group.get_balances().values())
+    assert not group.expenses and not group.transactions
+    assert all(v == 0 for v in group.total_paid_by_user().values())
+    print("test_oversized_amount_leaves_group_unchanged passed.")
+    
     print("Running test_simplify_debts...")
     group = create_group("Trip to Goa - simplify")
     user1 = add_user(group, "User1")
@@ -246,12 +527,78 @@ def run_tests():
     balances_after = group.get_balances()
     print("Settlements suggested:")
     for s in settlements:
-        print(f"  {group.users[s.from_user].name} -> {group.users[s.to_user].name}: {s.amount} {s.currency}")
+        print(f"  {group.users[s.from_user].name} -> {group.users[s.to_user].name}: {_to_dollars(s.amount):.2f} {s.currency}")
     print("Balances after simplification:", {group.users[k].name: v for k,v in balances_after.items()})
     assert abs(balances_after[user1.id]) < 1e-9
     assert abs(balances_after[user2.id]) < 1e-9
     print("test_simplify_debts passed.")
     
+    print("Running test_add_expenses_batch...")
+    group = create_group("Bank import")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    expenses = group.add_expenses_batch([
+        {"amount": 10, "split_type": "equal", "users": [user1.id, user2.id], "paid_by": user1.id},
+        {"amount": 30, "split_type": "exact", "exact_amounts": {user1.id: 10, user2.id: 20}},
+    ])
+    assert len(expenses) == 2 and len(group.expenses) == 2
+    balances = group.get_balances()
+    assert balances[user1.id] == 5.00
+    assert balances[user2.id] == 25.00
+    try:
+        group.add_expenses_batch([
+            {"amount": 10, "split_type": "equal", "users": [user1.id]},
+            {"amount": 10, "split_type": "equal", "users": ["missing"]},
+        ])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert group.get_balances() == balances and len(group.expenses) == 2
+    print("test_add_expenses_batch passed. Balances:", {group.users[k].name: v for k,v in balances.items()})
+    
+    print("Running test_total_paid_by_user...")
+    group = create_group("Weekend")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    group.add_expense(amount=12.5, split_type="equal", users=[user1.id, user2.id], paid_by=user1.id)
+    group.add_expense(amount=7.5, split_type="equal", users=[user1.id, user2.id], paid_by=user1.id)
+    group.add_expense(amount=3, split_type="equal", users=[user1.id, user2.id])
+    totals = group.total_paid_by_user()
+    assert totals[user1.id] == 20.00
+    assert totals[user2.id] == 0.00
+    print("test_total_paid_by_user passed. Totals:", {group.users[k].name: v for k,v in totals.items()})
+    
+    print("Running test_iter_simplify_debts_is_lazy...")
+    group = create_group("Road trip")
+    user1 = add_user(group, "User1")
+    user2 = add_user(group, "User2")
+    user3 = add_user(group, "User3")
+    group.add_expense(amount=30, split_type="equal", users=[user1.id, user2.id, user3.id], paid_by=user1.id)
+    logged_before = len(group.transactions)
+    settlements = iter_simplify_debts(group)
+    assert len(group.transactions) == logged_before
+    first = next(settlements)
+    assert len(group.transactions) == logged_before + 1
+    balances = group.get_balances()
+    assert balances[first.from_user] == 0.00
+    assert balances[user1.id] == -10.00
+    assert sum(1 for v in balances.values() if v != 0) == 2
+    rest = list(settlements)
+    assert len(rest) == 1
+    assert all(v == 0 for v in group.get_balances().values())
+    print("test_iter_simplify_debts_is_lazy passed.")
+    
+    print("Running test_simplify_debts_exact...")
+    group = create_group("Flatmates")
+    users = [add_user(group, f"User{i}") for i in range(1, 6)]
+    ids = [u.id for u in users]
+    group.add_expense(amount=60, split_type="exact", exact_amounts={ids[0]: 30, ids[1]: 30}, paid_by=ids[3])
+    group.add_expense(amount=50, split_type="equal", users=[ids[2]], paid_by=ids[4])
+    settlements = group.simplify_debts(mode="exact")
+    assert len(settlements) == 3
+    assert all(v == 0 for v in group.get_balances().values())
+    print("test_simplify_debts_exact passed. Transfers:", len(settlements))
+    
     print("\nAll tests passed.")
     
 if __name__ == "__main__":